@@ -12,6 +12,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from prometheus_client import Counter, Histogram, generate_latest
@@ -90,7 +91,8 @@ async def lifespan(app: FastAPI):
     db_path = os.getenv('DATABASE_PATH', 'data/conversations.db')
     logger.info(f"Initializing database at {db_path}")
     
-    db_manager = DatabaseManager(db_path)
+    query_timeout_ms = int(os.getenv('QUERY_TIMEOUT_MS', '5000'))
+    db_manager = DatabaseManager(db_path, query_timeout_ms=query_timeout_ms)
     search_engine = SearchEngine(db_manager)
     
     logger.info("API startup complete")
@@ -118,6 +120,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger JSON responses for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=500)
+
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
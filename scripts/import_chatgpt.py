@@ -138,7 +138,18 @@ class ChatGPTImporter:
         return messages
     
     def _process_batch(self, batch: list):
-        """Process a batch of conversations."""
+        """Process a batch of conversations in one transaction."""
+        try:
+            msg_count = self.db.insert_conversations_bulk([
+                (conversation.id, conversation.title, messages)
+                for conversation, messages in batch
+            ])
+            self.stats['conversations'] += len(batch)
+            self.stats['messages'] += msg_count
+            return
+        except Exception as e:
+            logger.warning(f"Batch insert failed, retrying conversations individually: {e}")
+        
         for conversation, messages in batch:
             try:
                 msg_count = self.db.insert_conversation(
@@ -6,24 +6,46 @@ from typing import List, Dict, Any, Optional, Tuple
 from contextlib import contextmanager
 from datetime import datetime
 import os
+import time
 
 logger = logging.getLogger(__name__)
 
+# SQLite VM instructions between query timeout checks
+QUERY_TIMEOUT_CHECK_OPS = 10000
+
 
 class DatabaseManager:
     """Manages SQLite database with FTS5 for conversation search."""
     
-    def __init__(self, db_path: str):
-        """Initialize database manager."""
+    def __init__(self, db_path: str, query_timeout_ms: Optional[int] = None):
+        """
+        Initialize database manager.
+        
+        Args:
+            db_path: Path to the SQLite database file
+            query_timeout_ms: Abort search queries running longer than this
+        """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.query_timeout_ms = query_timeout_ms
         self._initialize_database()
     
     @contextmanager
-    def get_connection(self):
-        """Context manager for database connections."""
+    def get_connection(self, timeout_ms: Optional[int] = None):
+        """
+        Context manager for database connections.
+        
+        If timeout_ms is given, statements still running after that many
+        milliseconds are interrupted and raise sqlite3.OperationalError.
+        """
         conn = sqlite3.connect(str(self.db_path))
         conn.row_factory = sqlite3.Row
+        if timeout_ms:
+            deadline = time.monotonic() + timeout_ms / 1000
+            conn.set_progress_handler(
+                lambda: 1 if time.monotonic() > deadline else 0,
+                QUERY_TIMEOUT_CHECK_OPS
+            )
         try:
             yield conn
             conn.commit()
@@ -91,29 +113,49 @@ class DatabaseManager:
         Returns:
             Number of messages inserted
         """
-        with self.get_connection() as conn:
-            # Insert messages into FTS table
-            message_data = [
+        return self.insert_conversations_bulk([(conversation_id, title, messages)])
+    
+    def insert_conversations_bulk(self, conversations: List[Tuple[str, str, List[Tuple[str, str, datetime]]]]) -> int:
+        """
+        Insert many conversations in a single transaction.
+        
+        Args:
+            conversations: List of (conversation_id, title, messages) tuples,
+                where messages is a list of (sender, content, timestamp) tuples
+            
+        Returns:
+            Number of messages inserted
+        """
+        message_data = []
+        metadata_data = []
+        
+        for conversation_id, title, messages in conversations:
+            message_data.extend(
                 (conversation_id, timestamp.isoformat(), sender, content)
                 for sender, content, timestamp in messages
-            ]
+            )
             
+            created_at = messages[0][2].isoformat() if messages else datetime.now().isoformat()
+            updated_at = messages[-1][2].isoformat() if messages else datetime.now().isoformat()
+            metadata_data.append(
+                (conversation_id, title, len(messages), created_at, updated_at)
+            )
+        
+        with self.get_connection() as conn:
+            # Insert messages into FTS table
             conn.executemany("""
                 INSERT INTO conversations (conversation_id, timestamp, sender, content)
                 VALUES (?, ?, ?, ?)
             """, message_data)
             
             # Insert/update metadata
-            created_at = messages[0][2].isoformat() if messages else datetime.now().isoformat()
-            updated_at = messages[-1][2].isoformat() if messages else datetime.now().isoformat()
-            
-            conn.execute("""
+            conn.executemany("""
                 INSERT OR REPLACE INTO metadata 
                 (conversation_id, title, message_count, created_at, updated_at)
                 VALUES (?, ?, ?, ?, ?)
-            """, (conversation_id, title, len(messages), created_at, updated_at))
+            """, metadata_data)
             
-            return len(messages)
+            return len(message_data)
     
     def search_conversations(self, query: str, limit: int = 20, 
                            offset: int = 0) -> List[Dict[str, Any]]:
@@ -128,7 +170,7 @@ class DatabaseManager:
         Returns:
             List of search results with snippets
         """
-        with self.get_connection() as conn:
+        with self.get_connection(self.query_timeout_ms) as conn:
             # Search with snippet generation
             results = conn.execute("""
                 SELECT 
@@ -1,11 +1,84 @@
 """Search logic and query processing."""
 import re
 import logging
+import functools
 from typing import List, Dict, Any, Optional
 from .database import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# FTS5 boolean operators, detected in a single case-insensitive scan
+_BOOLEAN_OPERATOR_RE = re.compile(r'\s(?:AND|OR|NOT)\s', re.IGNORECASE)
+_FTS5_OPERATORS = frozenset({'AND', 'OR', 'NOT'})
+
+# Null and other control characters (tab/newline/carriage return are kept)
+_CONTROL_CHARS = dict.fromkeys([c for c in range(32) if c not in (9, 10, 13)] + [127])
+
+# A quoted phrase (closing quote and trailing * optional) or a bare token
+_QUERY_TOKEN_RE = re.compile(r'"([^"]*)"?(\*)?|(\S+)')
+
+# Conversation IDs are UUID-like: restrict to a whitelist of characters
+_CONVERSATION_ID_RE = re.compile(r'\A[A-Za-z0-9_-]{1,64}\Z')
+
+
+def _quote_token(token: str) -> str:
+    """Quote a bare token as an FTS5 string, keeping a trailing * as prefix."""
+    prefix = token.endswith('*')
+    token = token.replace('"', '').rstrip('*')
+    if not token:
+        return ''
+    return f'"{token}"*' if prefix else f'"{token}"'
+
+
+@functools.lru_cache(maxsize=4096)
+def _process_fts5_query(query: str) -> str:
+    """
+    Process query for FTS5 syntax.
+    
+    Every search term is passed to FTS5 as a double-quoted string, so
+    punctuation in user input is matched literally instead of being
+    parsed as query syntax.
+    
+    Handles:
+    - Phrase searches with quotes
+    - AND/OR/NOT operators (uppercase only, as in FTS5)
+    - Prefix searches with *
+    """
+    # Remove dangerous characters
+    query = query.translate(_CONTROL_CHARS).strip()
+    
+    # Simple multi-word queries search as a single phrase
+    if '"' not in query and not _BOOLEAN_OPERATOR_RE.search(query):
+        words = query.split()
+        if len(words) > 1:
+            return _quote_token(' '.join(words))
+    
+    # Quoted terms and candidate operators, in query order
+    items = []
+    for match in _QUERY_TOKEN_RE.finditer(query):
+        phrase, prefix, token = match.groups()
+        if token is None:
+            phrase = phrase.strip()
+            if phrase:
+                items.append(f'"{phrase}"*' if prefix else f'"{phrase}"')
+        elif token in _FTS5_OPERATORS:
+            items.append(token)
+        else:
+            quoted = _quote_token(token)
+            if quoted:
+                items.append(quoted)
+    
+    # An operator needs a term on each side; otherwise search for it as a word
+    terms = []
+    for i, item in enumerate(items):
+        if item in _FTS5_OPERATORS and (
+            i == 0 or i == len(items) - 1 or terms[-1] in _FTS5_OPERATORS
+        ):
+            item = f'"{item}"'
+        terms.append(item)
+    
+    return ' '.join(terms)
+
 
 class SearchEngine:
     """Handles search queries and result processing."""
@@ -33,6 +106,19 @@ class SearchEngine:
         # Process query for FTS5
         processed_query = self._process_query(query)
         
+        # Nothing searchable left (e.g. only quotes or *); FTS5 rejects ''
+        if not processed_query:
+            return {
+                'query': query,
+                'processed_query': processed_query,
+                'results': [],
+                'count': 0,
+                'total': 0,
+                'limit': limit,
+                'offset': offset,
+                'has_more': False
+            }
+        
         try:
             # Execute search
             results = self.db.search_conversations(processed_query, limit, offset)
@@ -61,37 +147,13 @@ class SearchEngine:
             }
     
     def _process_query(self, query: str) -> str:
-        """
-        Process query for FTS5 syntax.
-        
-        Handles:
-        - Phrase searches with quotes
-        - AND/OR operators
-        - Prefix searches with *
-        """
-        # Remove dangerous characters
-        query = query.strip()
-        
-        # If query has quotes, preserve them for phrase search
-        if '"' in query:
-            return query
-        
-        # If query has boolean operators, preserve them
-        if any(op in query.upper() for op in [' AND ', ' OR ', ' NOT ']):
-            return query
-        
-        # For simple queries, make each word required (implicit AND)
-        words = query.split()
-        if len(words) > 1:
-            # Quote multi-word phrases to search as a unit
-            return f'"{query}"'
-        
-        return query
+        """Process query for FTS5 syntax (memoized per query string)."""
+        return _process_fts5_query(query)
     
     def _count_results(self, processed_query: str) -> int:
         """Count total results for a query."""
         try:
-            with self.db.get_connection() as conn:
+            with self.db.get_connection(self.db.query_timeout_ms) as conn:
                 result = conn.execute("""
                     SELECT COUNT(*) 
                     FROM conversations 
@@ -102,8 +164,15 @@ class SearchEngine:
             logger.error(f"Error counting results: {e}")
             return 0
     
+    @staticmethod
+    def _is_valid_conversation_id(conversation_id: str) -> bool:
+        """Check a conversation ID against the allowed character whitelist."""
+        return bool(_CONVERSATION_ID_RE.match(conversation_id))
+    
     def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
         """Get full conversation by ID."""
+        if not self._is_valid_conversation_id(conversation_id):
+            return None
         return self.db.get_conversation(conversation_id)
     
     def suggest_queries(self, partial_query: str) -> List[str]:
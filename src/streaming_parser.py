@@ -1,8 +1,10 @@
 """Streaming JSON parser for large ChatGPT export files."""
 import ijson
+import mmap
 import logging
 from pathlib import Path
 from typing import Iterator, Dict, Any, Optional
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -67,6 +69,24 @@ class StreamingJSONParser:
         if not self.file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
     
+    @contextmanager
+    def _open_stream(self):
+        """
+        Open the export file as a read-only memory map.
+        
+        Sequential read-ahead is advised where madvise is available. Empty
+        files cannot be mapped and fall back to a regular file object.
+        """
+        with open(self.file_path, 'rb') as file:
+            if self.file_path.stat().st_size == 0:
+                yield file
+                return
+            
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mapped, 'madvise'):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                yield mapped
+    
     def parse_conversations(self) -> Iterator[Conversation]:
         """
         Stream conversations from ChatGPT export file.
@@ -75,7 +95,7 @@ class StreamingJSONParser:
             Conversation objects parsed from the JSON file.
         """
         try:
-            with open(self.file_path, 'rb') as file:
+            with self._open_stream() as file:
                 parser = ijson.items(file, 'item')
                 
                 for conversation_data in parser:
@@ -99,7 +119,7 @@ class StreamingJSONParser:
         """Count total conversations in the file."""
         count = 0
         try:
-            with open(self.file_path, 'rb') as file:
+            with self._open_stream() as file:
                 parser = ijson.items(file, 'item')
                 for _ in parser:
                     count += 1
@@ -1,36 +1,72 @@
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 import logging
 import sys
+import re
 import json
+import functools
 import pandas as pd
+import orjson
 from datetime import datetime
+from itertools import islice
 import traceback
 
-# Configure logging to stdout for Docker visibility
-logging.basicConfig(
-    stream=sys.stdout,
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    force=True
-)
 logger = logging.getLogger(__name__)
 
 # Environment configuration
 API_URL = os.getenv("API_URL", "http://api:8000")
 DEBUG_MODE = os.getenv("DEBUG_MODE", "false").lower() == "true"
+MAX_SEARCH_HISTORY = 100
+PAGE_SIZE = 20
+MAX_RESPONSE_BYTES = 10 * 1024 * 1024
+
+# FTS5 snippet highlight tags
+MARK_TAG_RE = re.compile(r'</?mark>')
+
+@st.cache_resource(show_spinner=False)
+def init_logging():
+    """Configure logging once per process instead of on every Streamlit rerun"""
+    # Log to stdout for Docker visibility
+    logging.basicConfig(
+        stream=sys.stdout,
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        force=True
+    )
+    logger.info(f"Streamlit UI starting - API URL: {API_URL}")
+
+init_logging()
+
+# Result fields shown in the table view, mapped to their column headers
+TABLE_COLUMNS = {
+    'conversation_id': 'ID',
+    'title': 'Title',
+    'timestamp': 'Created',
+    'updated_at': 'Updated',
+    'sender': 'Sender',
+    'message_count': 'Message Count',
+    'rank': 'Rank'
+}
 
 # Initialize session state
 if 'search_history' not in st.session_state:
-    st.session_state.search_history = []
+    # Insertion-ordered dict used as an ordered set of past queries
+    st.session_state.search_history = {}
 if 'current_results' not in st.session_state:
     st.session_state.current_results = None
+    st.session_state.current_export = None
+    st.session_state.current_results_ts = None
+if 'search_query' not in st.session_state:
+    st.session_state.search_query = None
+    st.session_state.page = 0
+    st.session_state.total_results = 0
+    st.session_state.has_more = False
 if 'debug_mode' not in st.session_state:
     st.session_state.debug_mode = DEBUG_MODE
 
-logger.info(f"Streamlit UI starting - API URL: {API_URL}")
-
 # App configuration
 st.set_page_config(
     page_title="ChatGPT Search",
@@ -38,12 +74,98 @@ st.set_page_config(
     layout="wide"
 )
 
+@st.cache_resource
+def get_session():
+    """Shared HTTP session so API connections are kept alive across reruns"""
+    session = requests.Session()
+    session.headers.update({
+        'Accept': 'application/json',
+        'Accept-Encoding': 'gzip, deflate'
+    })
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=2, read=False, backoff_factor=0.1, status_forcelist=[502, 503, 504])
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def request_search(api_url, query, offset=0):
+    """Send a search request for one page of results and return the raw response"""
+    response = get_session().get(
+        f"{api_url}/search", 
+        params={"q": query, "limit": PAGE_SIZE, "offset": offset}, 
+        timeout=10,
+        stream=True
+    )
+    logger.info(f"Response status: {response.status_code}")
+    return response
+
+def read_response_body(response):
+    """Read a streamed response body, refusing anything over MAX_RESPONSE_BYTES"""
+    if int(response.headers.get('Content-Length', 0)) > MAX_RESPONSE_BYTES:
+        raise ValueError(f"API response exceeds {MAX_RESPONSE_BYTES} bytes")
+    
+    body = bytearray()
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        body.extend(chunk)
+        if len(body) > MAX_RESPONSE_BYTES:
+            raise ValueError(f"API response exceeds {MAX_RESPONSE_BYTES} bytes")
+    return bytes(body)
+
+class SearchAPIError(Exception):
+    """Error reported in the body of an HTTP 200 search response"""
+
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
+def fetch_search(api_url, query, offset=0):
+    """Fetch and parse search results, cached per query so repeat searches skip the API"""
+    with request_search(api_url, query, offset) as response:
+        response.raise_for_status()
+        data = orjson.loads(read_response_body(response))
+    
+    # The API reports failures as 200 with an error field; raise so they aren't cached
+    if data.get('error'):
+        raise SearchAPIError(data['error'])
+    return data
+
+@functools.lru_cache(maxsize=2048)
 def format_snippet(text):
     """Replace FTS5 mark tags with Markdown formatting"""
     if text:
-        return text.replace('<mark>', '**').replace('</mark>', '**')
+        return MARK_TAG_RE.sub('**', text)
     return text
 
+@functools.lru_cache(maxsize=4096)
+def format_timestamp(timestamp, fmt='%B %d, %Y at %I:%M %p'):
+    """Format an ISO timestamp for display, returning it unchanged if it can't be parsed"""
+    try:
+        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        return dt.strftime(fmt)
+    except (AttributeError, ValueError):
+        return timestamp
+
+def format_timestamp_column(series, fmt):
+    """Format a column of ISO timestamps per value, keeping values that fail to parse"""
+    return series.fillna('Unknown').astype(str).map(functools.partial(format_timestamp, fmt=fmt))
+
+@st.cache_data(ttl=300, max_entries=128, show_spinner=False)
+def build_results_table(results):
+    """Build the table view DataFrame, cached so reruns and tab switches reuse it"""
+    df = pd.DataFrame.from_records(results, columns=list(TABLE_COLUMNS))
+    df = df.fillna({
+        'conversation_id': 'Unknown',
+        'title': 'Untitled',
+        'sender': 'Unknown',
+        'message_count': 0,
+        'rank': 0
+    })
+    df['timestamp'] = format_timestamp_column(df['timestamp'], '%Y-%m-%d %H:%M')
+    df['updated_at'] = format_timestamp_column(df['updated_at'], '%Y-%m-%d %H:%M')
+    df['message_count'] = df['message_count'].astype(int)
+    df['rank'] = df['rank'].map('{:.2f}'.format)
+    return df.rename(columns=TABLE_COLUMNS)
+
 def display_search_results(data):
     """Display search results with proper error handling and multiple view formats"""
     try:
@@ -53,7 +175,7 @@ def display_search_results(data):
             st.info("No results found for your search query.")
             return
         
-        st.success(f"Found {len(results)} results")
+        st.success(f"Found {data.get('total', len(results))} results")
         
         # Create tabs for different view formats
         tab1, tab2, tab3 = st.tabs(["📋 Formatted View", "📊 Table View", "🔧 Raw JSON"])
@@ -68,36 +190,24 @@ def display_search_results(data):
                         # Use unique key for each expander
                         with st.expander(f"Conversation: {result.get('title', 'Untitled')} (ID: {result.get('conversation_id', 'Unknown')})", expanded=idx == 0):
                             # Format timestamps
-                            timestamp = result.get('timestamp', 'Unknown')
-                            updated_at = result.get('updated_at', 'Unknown')
-                            
-                            if timestamp != 'Unknown':
-                                try:
-                                    dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                                    timestamp = dt.strftime('%B %d, %Y at %I:%M %p')
-                                except:
-                                    pass
+                            timestamp = format_timestamp(result.get('timestamp', 'Unknown'))
+                            updated_at = format_timestamp(result.get('updated_at', 'Unknown'))
                             
-                            if updated_at != 'Unknown':
-                                try:
-                                    dt = datetime.fromisoformat(updated_at.replace('Z', '+00:00'))
-                                    updated_at = dt.strftime('%B %d, %Y at %I:%M %p')
-                                except:
-                                    pass
+                            # Conversation metadata and snippet, sent as a single markdown element
+                            parts = [
+                                f"**Created:** {timestamp}",
+                                f"**Updated:** {updated_at}",
+                                f"**Sender:** {result.get('sender', 'Unknown')}",
+                                f"**Message Count:** {result.get('message_count', 0)}",
+                                f"**Relevance Rank:** {result.get('rank', 0):.2f}"
+                            ]
                             
-                            # Display conversation metadata
-                            st.markdown(f"**Created:** {timestamp}")
-                            st.markdown(f"**Updated:** {updated_at}")
-                            st.markdown(f"**Sender:** {result.get('sender', 'Unknown')}")
-                            st.markdown(f"**Message Count:** {result.get('message_count', 0)}")
-                            st.markdown(f"**Relevance Rank:** {result.get('rank', 0):.2f}")
-                            
-                            # Display snippet with formatted marks
                             snippet = result.get('snippet', '')
                             if snippet:
-                                st.markdown("### Snippet")
-                                formatted_snippet = format_snippet(snippet)
-                                st.markdown(formatted_snippet)
+                                parts.append("### Snippet")
+                                parts.append(format_snippet(snippet))
+                            
+                            st.markdown("\n\n".join(parts))
                     
                     with col2:
                         # Action buttons with unique keys
@@ -106,52 +216,51 @@ def display_search_results(data):
         
         with tab2:
             # Table view
-            table_data = []
-            for result in results:
-                # Format timestamps for table
-                timestamp = result.get('timestamp', 'Unknown')
-                updated_at = result.get('updated_at', 'Unknown')
-                
-                if timestamp != 'Unknown':
-                    try:
-                        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                        timestamp = dt.strftime('%Y-%m-%d %H:%M')
-                    except:
-                        pass
-                
-                if updated_at != 'Unknown':
-                    try:
-                        dt = datetime.fromisoformat(updated_at.replace('Z', '+00:00'))
-                        updated_at = dt.strftime('%Y-%m-%d %H:%M')
-                    except:
-                        pass
-                
-                table_data.append({
-                    'ID': result.get('conversation_id', 'Unknown'),
-                    'Title': result.get('title', 'Untitled'),
-                    'Created': timestamp,
-                    'Updated': updated_at,
-                    'Sender': result.get('sender', 'Unknown'),
-                    'Message Count': result.get('message_count', 0),
-                    'Rank': f"{result.get('rank', 0):.2f}"
-                })
-            
-            df = pd.DataFrame(table_data)
-            st.dataframe(df, use_container_width=True)
+            st.dataframe(build_results_table(results), use_container_width=True)
         
         with tab3:
             # Raw JSON view
             st.json(results)
     
     except Exception as e:
-        logger.error(f"Error displaying search results: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error displaying search results")
         st.error(f"Error displaying results: {str(e)}")
         
         if st.session_state.debug_mode:
             st.error("Stack trace:")
             st.code(traceback.format_exc())
 
+def replay_history():
+    """Load the selected history entry into the search box"""
+    selected = st.session_state.history_select
+    if selected:
+        st.session_state.query_rerun = selected
+        st.session_state.history_select = ''
+
+def change_page(step):
+    """Move to the previous or next page of the active search"""
+    st.session_state.pending_page = max(0, st.session_state.page + step)
+
+def display_page_controls():
+    """Show previous/next buttons for paging through the active search"""
+    page = st.session_state.page
+    page_count = max(1, -(-st.session_state.total_results // PAGE_SIZE))
+    if page_count == 1 and page == 0:
+        return
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    
+    with col1:
+        st.button("◀ Previous", key="page_prev", disabled=page == 0,
+                  on_click=change_page, args=(-1,), use_container_width=True)
+    
+    with col2:
+        st.caption(f"Page {page + 1} of {page_count}")
+    
+    with col3:
+        st.button("Next ▶", key="page_next", disabled=not st.session_state.has_more,
+                  on_click=change_page, args=(1,), use_container_width=True)
+
 def main():
     st.title("🔍 ChatGPT Conversation Search")
     
@@ -166,13 +275,18 @@ def main():
         
         if st.session_state.debug_mode:
             st.info(f"API URL: {API_URL}")
+            st.checkbox("Show response headers", key="debug_headers")
+            st.checkbox("Show raw API response", key="debug_raw")
         
         # Search history
         if st.session_state.search_history:
             st.header("Recent Searches")
-            for hist_idx, hist_query in enumerate(reversed(st.session_state.search_history[-10:])):
-                if st.button(hist_query, key=f"hist_{hist_idx}"):
-                    st.session_state.query_rerun = hist_query
+            st.selectbox(
+                "Replay a previous search",
+                options=[''] + list(islice(reversed(st.session_state.search_history), 10)),
+                key="history_select",
+                on_change=replay_history
+            )
     
     # Main search interface
     query = st.text_input(
@@ -197,50 +311,63 @@ def main():
         if st.session_state.current_results:
             st.download_button(
                 "📥 Export JSON",
-                data=json.dumps(st.session_state.current_results, indent=2),
-                file_name=f"search_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                data=st.session_state.current_export,
+                file_name=f"search_results_{st.session_state.current_results_ts}.json",
                 mime="application/json",
                 use_container_width=True
             )
     
     if clear_button:
         st.session_state.current_results = None
+        st.session_state.current_export = None
         st.rerun()
     
+    pending_page = st.session_state.pop('pending_page', None)
+    fetch_query = None
+    
     if search_button and query:
         # Add to search history
-        if query not in st.session_state.search_history:
-            st.session_state.search_history.append(query)
+        history = st.session_state.search_history
+        if query not in history:
+            history[query] = None
+            if len(history) > MAX_SEARCH_HISTORY:
+                del history[next(iter(history))]
+        
+        # A new search starts from the first page
+        fetch_query = query
+        fetch_page = 0
+    elif pending_page is not None and st.session_state.search_query:
+        fetch_query = st.session_state.search_query
+        fetch_page = pending_page
+    
+    if fetch_query:
+        offset = fetch_page * PAGE_SIZE
         
         with st.spinner("Searching..."):
             try:
                 # Log the request
-                logger.info(f"Searching for: {query}")
+                logger.info(f"Searching for: {fetch_query} (offset {offset})")
                 logger.info(f"Making API call to {API_URL}/search")
                 
-                # Make API request
-                response = requests.get(
-                    f"{API_URL}/search", 
-                    params={"q": query}, 
-                    timeout=10
-                )
-                
-                # Log response details
-                logger.info(f"Response status: {response.status_code}")
-                
                 if st.session_state.debug_mode:
-                    st.info(f"API Response Status: {response.status_code}")
-                    st.info(f"Response Headers: {dict(response.headers)}")
-                
-                response.raise_for_status()
-                data = response.json()
+                    # Bypass the cache so the live response status and headers are shown
+                    with request_search(API_URL, fetch_query, offset) as response:
+                        st.info(f"API Response Status: {response.status_code}")
+                        if st.session_state.debug_headers:
+                            st.json(dict(response.headers))
+                        
+                        response.raise_for_status()
+                        body = read_response_body(response)
+                    data = orjson.loads(body)
+                else:
+                    data = fetch_search(API_URL, fetch_query, offset)
                 
                 # Log response data
                 logger.info(f"Response data keys: {list(data.keys())}")
                 if 'results' in data:
                     logger.info(f"Number of results: {len(data.get('results', []))}")
                 
-                if st.session_state.debug_mode:
+                if st.session_state.debug_mode and st.session_state.debug_raw:
                     with st.expander("Raw API Response"):
                         st.json(data)
                 
@@ -249,11 +376,20 @@ def main():
                     st.error(f"API Error: {data['error']}")
                     logger.error(f"API returned error: {data['error']}")
                 else:
-                    # Store results in session state
+                    # Store results and paging state only once the fetch succeeds
+                    st.session_state.search_query = fetch_query
+                    st.session_state.page = fetch_page
                     st.session_state.current_results = data.get('results', [])
+                    st.session_state.current_export = orjson.dumps(
+                        st.session_state.current_results, option=orjson.OPT_INDENT_2
+                    )
+                    st.session_state.current_results_ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+                    st.session_state.total_results = data.get('total', 0)
+                    st.session_state.has_more = data.get('has_more', False)
                     
                     # Display results
                     display_search_results(data)
+                    display_page_controls()
             
             except requests.exceptions.Timeout:
                 error_msg = "Search request timed out. Please try again."
@@ -281,7 +417,11 @@ def main():
                 
                 if st.session_state.debug_mode:
                     st.error("Raw response:")
-                    st.code(response.text if 'response' in locals() else "No response available")
+                    st.code(body.decode('utf-8', 'replace') if 'body' in locals() else "No response available")
+            
+            except SearchAPIError as e:
+                st.error(f"API Error: {e}")
+                logger.error(f"API returned error: {e}")
             
             except Exception as e:
                 error_msg = f"Unexpected error: {str(e)}"
@@ -295,7 +435,11 @@ def main():
     # Display existing results if available
     elif st.session_state.current_results and not search_button:
         st.info("Showing previous search results")
-        display_search_results({'results': st.session_state.current_results})
+        display_search_results({
+            'results': st.session_state.current_results,
+            'total': st.session_state.total_results
+        })
+        display_page_controls()
 
 if __name__ == "__main__":
     try: